@@ -0,0 +1,459 @@
+import argparse
+import bisect
+import functools
+import heapq
+import json
+import logging
+import math
+import random
+
+from collections import deque
+from datetime import datetime
+
+from utils import date, placement
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _load_records(path: str) -> list:
+    """Loads exported DynamoDB records from a file containing either a JSON array or one JSON record per line
+
+    :param path the path of the file containing the exported records
+    :returns a list of record dictionaries
+    """
+    with open(path) as records_file:
+        contents = records_file.read().strip()
+    if contents.startswith("["):
+        return json.loads(contents)
+    return [json.loads(line) for line in contents.splitlines() if line.strip()]
+
+
+@functools.lru_cache(maxsize=None)
+def _to_seconds(datetime_string: str) -> float:
+    """Converts a datetime string as recorded in Dynamo into seconds since the epoch, caching the results since
+    the recorded datetimes only have minute resolution and repeat across steps and strategies
+
+    :param datetime_string the string to convert
+    :returns the number of seconds since the epoch or None if the string is empty
+    """
+    datetime_object = date.from_string(datetime_string)
+    if datetime_object is None:
+        return None
+    return (datetime_object - _EPOCH).total_seconds()
+
+
+def _build_clusters(cluster_records: list, pool_id: str) -> tuple:
+    """Creates the simulated clusters of a pool from exported sparkflow_clusters records, keeping the copy with the
+    most complete timeline when a cluster appears in more than one export
+
+    :param cluster_records a list of cluster records from DynamoDB
+    :param pool_id the ID of the cluster pool to simulate
+    :returns a tuple consisting of the simulated clusters sorted by creation time, the number of records skipped
+    because of datetimes that could not be parsed and the number of duplicate records dropped
+    """
+    clusters_by_id = {}
+    completeness_by_id = {}
+    skipped = 0
+    duplicates = 0
+    for record in cluster_records:
+        if record.get("cluster_pool_id") != pool_id:
+            continue
+        try:
+            available_from = _to_seconds(record.get("creation_datetime", ""))
+            available_until = _to_seconds(record.get("end_datetime", ""))
+        except ValueError:
+            skipped += 1
+            continue
+        cluster_id = record["cluster_id"]
+        completeness = (available_from is not None) + (available_until is not None)
+        if cluster_id in clusters_by_id:
+            duplicates += 1
+            if completeness <= completeness_by_id[cluster_id]:
+                continue
+        completeness_by_id[cluster_id] = completeness
+        clusters_by_id[cluster_id] = {
+            "cluster_id": cluster_id,
+            "available_from": -math.inf if available_from is None else available_from,
+            "available_until": math.inf if available_until is None else available_until,
+            "record": {"cluster_id": cluster_id, "state": "WAITING", "number_of_steps": 0},
+            "running": {},
+            "queue": deque(),
+            "busy_intervals": [],
+            "steps_placed": 0
+        }
+    clusters = sorted(clusters_by_id.values(), key=lambda x: x["available_from"])
+    return clusters, skipped, duplicates
+
+
+def _build_steps(step_records: list, cluster_pool_ids: dict, pool_id: str) -> tuple:
+    """Creates the steps to replay from exported sparkflow_job_runs records, keeping only the ones that ran on a
+    cluster of the given pool and have a complete timeline
+
+    :param step_records a list of step records from DynamoDB
+    :param cluster_pool_ids a dictionary of cluster_id to cluster_pool_id for every exported cluster
+    :param pool_id the ID of the cluster pool to simulate
+    :returns a tuple consisting of the steps to replay sorted by submission time and the number of records skipped
+    because of incomplete or unparseable timelines
+    """
+    steps = []
+    skipped = 0
+    for record in step_records:
+        if cluster_pool_ids.get(record.get("cluster_id")) != pool_id:
+            continue
+        try:
+            submitted = _to_seconds(record.get("submitted_datetime", ""))
+            started = _to_seconds(record.get("start_datetime", ""))
+            ended = _to_seconds(record.get("end_datetime", ""))
+        except ValueError:
+            skipped += 1
+            continue
+        if submitted is None or started is None or ended is None or ended < started:
+            skipped += 1
+            continue
+        steps.append({
+            "job_id": record.get("job_id"),
+            "cluster_id": record["cluster_id"],
+            "submitted": submitted,
+            "observed_wait": max(started - submitted, 0.0),
+            "duration": ended - started
+        })
+    steps.sort(key=lambda x: x["submitted"])
+    return steps, skipped
+
+
+def get_pool_ids(cluster_records: list) -> list:
+    """Retrieves the IDs of all the cluster pools present in exported sparkflow_clusters records
+
+    :param cluster_records a list of cluster records from DynamoDB
+    :returns a sorted list of cluster pool IDs
+    """
+    return sorted({record["cluster_pool_id"] for record in cluster_records if record.get("cluster_pool_id")})
+
+
+def count_steps_without_cluster(step_records: list, cluster_records: list) -> int:
+    """Counts the steps whose cluster is missing from the export, which can't be attributed to any pool and are
+    left out of every replay
+
+    :param step_records a list of step records from DynamoDB
+    :param cluster_records a list of cluster records from DynamoDB
+    :returns the number of step records without an exported cluster
+    """
+    cluster_ids = {record["cluster_id"] for record in cluster_records if record.get("cluster_pool_id")}
+    return sum(1 for record in step_records if record.get("cluster_id") not in cluster_ids)
+
+
+def _fewest_steps_strategy() -> callable:
+    """Places steps with the same logic the step_manager Lambda uses"""
+    def strategy(cluster_records: list, step_to_place: dict) -> str:
+        return placement.get_cluster_id_to_accept_step(cluster_records)
+    return strategy
+
+
+def _round_robin_strategy() -> callable:
+    """Places steps on eligible clusters in turn"""
+    counter = [0]
+
+    def strategy(cluster_records: list, step_to_place: dict) -> str:
+        counter[0] += 1
+        return cluster_records[counter[0] % len(cluster_records)]["cluster_id"]
+    return strategy
+
+
+def _random_strategy(seed: int = 0) -> callable:
+    """Places steps on a random eligible cluster
+
+    :param seed the seed to make the placements reproducible with
+    """
+    generator = random.Random(seed)
+
+    def strategy(cluster_records: list, step_to_place: dict) -> str:
+        return generator.choice(cluster_records)["cluster_id"]
+    return strategy
+
+
+def _historical_strategy() -> callable:
+    """Places steps on the cluster they were recorded on, falling back to the step_manager logic when that cluster
+    is not eligible at submission time"""
+    def strategy(cluster_records: list, step_to_place: dict) -> str:
+        for cluster_record in cluster_records:
+            if cluster_record["cluster_id"] == step_to_place["cluster_id"]:
+                return cluster_record["cluster_id"]
+        return placement.get_cluster_id_to_accept_step(cluster_records)
+    return strategy
+
+
+STRATEGIES = {
+    "fewest_steps": _fewest_steps_strategy,
+    "round_robin": _round_robin_strategy,
+    "random": _random_strategy,
+    "historical": _historical_strategy
+}
+
+
+def get_strategy(name: str) -> callable:
+    """Creates a placement strategy by name
+
+    :param name the name of the strategy as present in STRATEGIES
+    :returns a callable taking the eligible cluster records and the step to place and returning a cluster_id
+    """
+    if name not in STRATEGIES:
+        raise ValueError("strategy must be one of {0} but found {1}".format(list(STRATEGIES), name))
+    return STRATEGIES[name]()
+
+
+def _percentiles(values: list, percentiles: tuple = (50, 90, 95, 99)) -> dict:
+    """Computes nearest-rank percentiles along with the mean and max of the given values
+
+    :param values a list of numbers to summarize
+    :param percentiles the percentiles to compute
+    :returns a dictionary of summary statistic name to value
+    """
+    if not values:
+        return {}
+    ordered = sorted(values)
+    summary = {"p{0}".format(p): ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)] for p in percentiles}
+    summary["mean"] = sum(ordered) / len(ordered)
+    summary["max"] = ordered[-1]
+    return summary
+
+
+def _get_live_cluster_records(active_clusters: dict) -> list:
+    """Updates the simulated Dynamo records of the clusters currently alive
+
+    :param active_clusters a dictionary of cluster_id to simulated cluster for the clusters currently alive
+    :returns the records of the clusters alive
+    """
+    records = []
+    for simulated_cluster in active_clusters.values():
+        record = simulated_cluster["record"]
+        record["state"] = "RUNNING" if record["number_of_steps"] > 0 else "WAITING"
+        records.append(record)
+    return records
+
+
+def _get_load_skew(cluster_windows: list) -> float:
+    """Computes the load skew of clusters alive at the same time
+
+    The replay is sliced at every cluster creation and termination so each slice has a fixed set of live clusters.
+    The skew of a slice is the max over the mean busy time of its live clusters, and the slices are averaged
+    weighted by their busy time.
+
+    :param cluster_windows a list of (window start, window end, busy intervals) tuples, one per cluster
+    :returns the weighted mean load skew or 0.0 if there was no load
+    """
+    bounds = sorted({bound for window_start, window_end, _ in cluster_windows for bound in (window_start, window_end)})
+    slice_busy_seconds = [[] for _ in bounds]
+    for window_start, window_end, busy_intervals in cluster_windows:
+        first_slice = bisect.bisect_left(bounds, window_start)
+        last_slice = bisect.bisect_left(bounds, window_end)
+        busy_seconds = [0.0] * (last_slice - first_slice)
+        for interval_start, interval_end in busy_intervals:
+            slice_idx = max(bisect.bisect_right(bounds, interval_start) - 1, first_slice)
+            while slice_idx < last_slice and bounds[slice_idx] < interval_end:
+                overlap = min(interval_end, bounds[slice_idx + 1]) - max(interval_start, bounds[slice_idx])
+                busy_seconds[slice_idx - first_slice] += max(overlap, 0.0)
+                slice_idx += 1
+        for slice_idx in range(first_slice, last_slice):
+            slice_busy_seconds[slice_idx].append(busy_seconds[slice_idx - first_slice])
+    weighted_skew = 0.0
+    total_busy_seconds = 0.0
+    for busy_seconds in slice_busy_seconds:
+        slice_total = sum(busy_seconds)
+        if slice_total > 0:
+            weighted_skew += max(busy_seconds) * len(busy_seconds)
+            total_busy_seconds += slice_total
+    return weighted_skew / total_busy_seconds if total_busy_seconds else 0.0
+
+
+def simulate(step_records: list, cluster_records: list, strategy: callable,
+             pool_id: str, step_concurrency: int = 1) -> dict:
+    """Replays the submitted steps of a cluster pool against its simulated clusters as a discrete-event simulation
+
+    Each step arrives at its submitted_datetime and runs for as long as it did historically. Clusters run at most
+    step_concurrency steps at once and queue the rest in submission order. Clusters only accept steps between their
+    creation_datetime and end_datetime and, like EMR, interrupt their running steps and cancel their queued steps
+    when they terminate.
+
+    Utilization is the busy time of a cluster over the step slots it had during its window within the replay, and
+    load skew is the max over the mean busy time of clusters alive at the same time, averaged across the replay.
+
+    :param step_records a list of exported sparkflow_job_runs records
+    :param cluster_records a list of exported sparkflow_clusters records across all pools
+    :param strategy a callable taking the eligible cluster records and the step to place and returning a cluster_id
+    :param pool_id the ID of the cluster pool to simulate
+    :param step_concurrency the number of steps a cluster can run at the same time
+    :returns a report with queue wait percentiles, per-cluster load and makespan in seconds
+    """
+    if step_concurrency < 1:
+        raise ValueError("step_concurrency must be at least 1 but found {0}".format(step_concurrency))
+    cluster_pool_ids = {record["cluster_id"]: record.get("cluster_pool_id") for record in cluster_records}
+    clusters, clusters_skipped, clusters_duplicated = _build_clusters(cluster_records, pool_id)
+    clusters_by_id = {simulated_cluster["cluster_id"]: simulated_cluster for simulated_cluster in clusters}
+    steps, skipped = _build_steps(step_records, cluster_pool_ids, pool_id)
+    if clusters_skipped or clusters_duplicated or skipped:
+        logging.warning(
+            "Skipped {0} clusters with unparseable datetimes, {1} duplicate cluster records and {2} steps with "
+            "incomplete or unparseable timelines in pool {3}".format(
+                clusters_skipped, clusters_duplicated, skipped, pool_id))
+    logging.info("Replaying {0} steps on {1} clusters in pool {2}".format(len(steps), len(clusters), pool_id))
+
+    active_clusters = {}
+    terminations = []
+    completions = []
+    waits = []
+    counts = {"next_cluster": 0, "unplaced": 0, "cancelled": 0, "interrupted": 0}
+    last_event = [None]
+
+    def start_step(simulated_cluster: dict, step_to_start: dict, now: float) -> None:
+        simulated_cluster["running"][step_to_start["_seq"]] = now
+        waits.append(now - step_to_start["submitted"])
+        heapq.heappush(completions, (
+            now + step_to_start["duration"], step_to_start["_seq"], simulated_cluster["cluster_id"]))
+
+    def complete_next_step() -> None:
+        now, seq, cluster_id = heapq.heappop(completions)
+        simulated_cluster = clusters_by_id[cluster_id]
+        # Steps interrupted by their cluster terminating are no longer running
+        if seq not in simulated_cluster["running"]:
+            return
+        simulated_cluster["busy_intervals"].append((simulated_cluster["running"].pop(seq), now))
+        simulated_cluster["record"]["number_of_steps"] -= 1
+        last_event[0] = now
+        if simulated_cluster["queue"] and now < simulated_cluster["available_until"]:
+            start_step(simulated_cluster, simulated_cluster["queue"].popleft(), now)
+
+    def terminate_next_cluster() -> None:
+        now, cluster_id = heapq.heappop(terminations)
+        simulated_cluster = active_clusters.pop(cluster_id)
+        for started in simulated_cluster["running"].values():
+            simulated_cluster["busy_intervals"].append((started, now))
+            last_event[0] = now
+        counts["interrupted"] += len(simulated_cluster["running"])
+        counts["cancelled"] += len(simulated_cluster["queue"])
+        simulated_cluster["running"].clear()
+        simulated_cluster["queue"].clear()
+        simulated_cluster["record"]["number_of_steps"] = 0
+
+    def advance(until: float) -> None:
+        while counts["next_cluster"] < len(clusters) and clusters[counts["next_cluster"]]["available_from"] <= until:
+            simulated_cluster = clusters[counts["next_cluster"]]
+            active_clusters[simulated_cluster["cluster_id"]] = simulated_cluster
+            heapq.heappush(terminations, (simulated_cluster["available_until"], simulated_cluster["cluster_id"]))
+            counts["next_cluster"] += 1
+        while True:
+            next_completion = completions[0][0] if completions else math.inf
+            next_termination = terminations[0][0] if terminations else math.inf
+            if min(next_completion, next_termination) > until or next_completion == next_termination == math.inf:
+                return
+            # Steps finishing at the same time as a termination or a submission free up their slot first
+            if next_completion <= next_termination:
+                complete_next_step()
+            else:
+                terminate_next_cluster()
+
+    for seq, step_to_place in enumerate(steps):
+        now = step_to_place["submitted"]
+        step_to_place["_seq"] = seq
+        advance(now)
+        eligible = placement.get_eligible_clusters(_get_live_cluster_records(active_clusters))
+        if len(eligible) == 0:
+            counts["unplaced"] += 1
+            continue
+        simulated_cluster = clusters_by_id[strategy(eligible, step_to_place)]
+        simulated_cluster["steps_placed"] += 1
+        simulated_cluster["record"]["number_of_steps"] += 1
+        if len(simulated_cluster["running"]) < step_concurrency:
+            start_step(simulated_cluster, step_to_place, now)
+        else:
+            simulated_cluster["queue"].append(step_to_place)
+    advance(math.inf)
+
+    cluster_reports = {}
+    cluster_windows = []
+    for simulated_cluster in clusters:
+        busy_seconds = sum(end - start for start, end in simulated_cluster["busy_intervals"])
+        utilization = 0.0
+        if waits:
+            window_start = max(simulated_cluster["available_from"], steps[0]["submitted"])
+            window_end = min(simulated_cluster["available_until"], last_event[0])
+            if window_end > window_start:
+                utilization = busy_seconds / ((window_end - window_start) * step_concurrency)
+                cluster_windows.append((window_start, window_end, simulated_cluster["busy_intervals"]))
+        cluster_reports[simulated_cluster["cluster_id"]] = {
+            "steps": simulated_cluster["steps_placed"],
+            "busy_seconds": busy_seconds,
+            "utilization": utilization
+        }
+    return {
+        "steps_replayed": len(waits),
+        "steps_skipped": skipped,
+        "steps_unplaced": counts["unplaced"],
+        "steps_cancelled": counts["cancelled"],
+        "steps_interrupted": counts["interrupted"],
+        "clusters_skipped": clusters_skipped,
+        "clusters_duplicated": clusters_duplicated,
+        "queue_wait_seconds": _percentiles(waits),
+        "observed_queue_wait_seconds": _percentiles([step_to_place["observed_wait"] for step_to_place in steps]),
+        "makespan_seconds": last_event[0] - steps[0]["submitted"] if waits else 0.0,
+        "load_skew": _get_load_skew(cluster_windows),
+        "clusters": cluster_reports
+    }
+
+
+def _positive_int(value: str) -> int:
+    """Parses a command line argument that must be a positive integer
+
+    :param value the argument as passed on the command line
+    :returns the parsed integer
+    """
+    try:
+        parsed = int(value)
+    except ValueError:
+        parsed = 0
+    if parsed < 1:
+        raise argparse.ArgumentTypeError("must be a positive integer but found {0}".format(value))
+    return parsed
+
+
+def _parse_args(args: list = None) -> argparse.Namespace:
+    """Parses the command line arguments of the simulator
+
+    :param args an optional list of arguments to parse instead of sys.argv
+    :returns the parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Replays exported sparkflow step history against a pool of simulated EMR clusters")
+    parser.add_argument("--steps", required=True, help="exported sparkflow_job_runs records as JSON or JSON lines")
+    parser.add_argument("--clusters", required=True, help="exported sparkflow_clusters records as JSON or JSON lines")
+    parser.add_argument("--pool-id", action="append",
+                        help="a cluster pool to simulate, can be passed multiple times and defaults to every pool")
+    parser.add_argument("--strategy", action="append", choices=list(STRATEGIES),
+                        help="a placement strategy to simulate, can be passed multiple times")
+    parser.add_argument("--step-concurrency", type=_positive_int, default=1,
+                        help="the number of steps each cluster runs at the same time")
+    return parser.parse_args(args)
+
+
+def main(args: list = None) -> dict:
+    # Log to stderr so the report printed to stdout stays valid JSON
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parsed_args = _parse_args(args)
+    step_records = _load_records(parsed_args.steps)
+    cluster_records = _load_records(parsed_args.clusters)
+    steps_without_cluster = count_steps_without_cluster(step_records, cluster_records)
+    if steps_without_cluster:
+        logging.warning("Skipped {0} steps whose cluster is missing from the export".format(steps_without_cluster))
+    reports = {"steps_without_cluster": steps_without_cluster, "pools": {}}
+    # Pools are simulated separately since the step_manager Lambda only places steps within the requested pool
+    for pool_id in parsed_args.pool_id or get_pool_ids(cluster_records):
+        reports["pools"][pool_id] = {}
+        for strategy_name in parsed_args.strategy or ["fewest_steps"]:
+            reports["pools"][pool_id][strategy_name] = simulate(
+                step_records, cluster_records, get_strategy(strategy_name), pool_id, parsed_args.step_concurrency)
+    print(json.dumps(reports, indent=2))
+    return reports
+
+
+if __name__ == "__main__":
+    main()
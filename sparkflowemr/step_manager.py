@@ -1,8 +1,7 @@
 import logging
 import os
-import sys
 
-from utils import logger, validation, date
+from utils import logger, validation, date, placement
 from sparkflowtools.models import db, cluster, step
 
 
@@ -37,36 +36,6 @@ def _get_all_clusters_under_pool(pool_id: str, clusters_db: db.Dynamo, index_nam
         raise
 
 
-def _get_eligible_clusters(cluster_records: list) -> list:
-    """Gets all clusters in the given records collection with the eligible statuses that can accept steps
-
-    :param cluster_records a list of cluster records from DynamoDB
-    :returns a list of cluster records filtered to just those eligible
-    """
-    eligible_states = ["STARTING", "BOOTSTRAPPING", "RUNNING", "WAITING"]
-
-    def in_states(record: dict):
-        return record["state"].upper() in eligible_states
-    return list(filter(in_states, cluster_records))
-
-
-def _get_cluster_id_to_accept_step(cluster_records: list) -> str:
-    """Retrieves the ID of the cluster to submit the step to based on fewest number of steps in a pool of clusters
-
-    :param cluster_records a list of cluster records from DynamoDB
-    :returns the cluster_id as present in EMR
-    """
-    assert len(cluster_records) > 0
-    min_number_of_steps = sys.maxsize
-    cluster_id = ""
-    for cluster_record in cluster_records:
-        steps_on_cluster = cluster_record.get("number_of_steps", 0)
-        if steps_on_cluster < min_number_of_steps:
-            cluster_id = cluster_record["cluster_id"]
-            min_number_of_steps = steps_on_cluster
-    return cluster_id
-
-
 def _create_step_object(step_config: dict) -> step.EmrStep:
     """Creates a step object from the config as defined in sparkflowtools.models
 
@@ -151,11 +120,11 @@ def step_manager(event, context):
     steps_database.connect(steps_db)
 
     # Get the cluster to submit the step on
-    clusters = _get_eligible_clusters(
+    clusters = placement.get_eligible_clusters(
         _get_all_clusters_under_pool(pool_id, cluster_database, clusters_index_name))
     if len(clusters) == 0:
         raise RuntimeError("No eligible clusters found: {0}".format(clusters))
-    cluster_id = _get_cluster_id_to_accept_step(clusters)
+    cluster_id = placement.get_cluster_id_to_accept_step(clusters)
 
     # Create the step object from the given config passed into the Lambda
     emr_step = _create_step_object(step_config)
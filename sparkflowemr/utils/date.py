@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 
 def get_today() -> datetime:
@@ -26,6 +26,29 @@ def to_string(datetime_object: datetime, formatting: str = '%Y-%m-%dT%H:%M'):
     return datetime_object.strftime(formatting)
 
 
+def from_string(datetime_string: str, formatting: str = '%Y-%m-%dT%H:%M') -> datetime:
+    """Converts a given string into a datetime object, falling back to ISO 8601 parsing when the string does not
+    follow the given formatting
+
+    :param datetime_string the string to convert to a datetime object
+    :param formatting the expected formatting of the string
+    :returns a naive datetime object parsed from the string or None if the string is empty
+    :raises ValueError if the string follows neither the given formatting nor ISO 8601
+    """
+    if not datetime_string:
+        return None
+    try:
+        return datetime.strptime(datetime_string, formatting)
+    except ValueError:
+        # fromisoformat only accepts the Z suffix from Python 3.11 onwards
+        if datetime_string.endswith("Z"):
+            datetime_string = datetime_string[:-1] + "+00:00"
+        parsed = datetime.fromisoformat(datetime_string)
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
 def get_current_time_str(formatting: str = '%Y-%m-%dT%H:%M') -> str:
     """Provides the current time as a string
 
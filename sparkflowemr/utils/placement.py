@@ -0,0 +1,31 @@
+import sys
+
+
+def get_eligible_clusters(cluster_records: list) -> list:
+    """Gets all clusters in the given records collection with the eligible statuses that can accept steps
+
+    :param cluster_records a list of cluster records from DynamoDB
+    :returns a list of cluster records filtered to just those eligible
+    """
+    eligible_states = ["STARTING", "BOOTSTRAPPING", "RUNNING", "WAITING"]
+
+    def in_states(record: dict):
+        return record["state"].upper() in eligible_states
+    return list(filter(in_states, cluster_records))
+
+
+def get_cluster_id_to_accept_step(cluster_records: list) -> str:
+    """Retrieves the ID of the cluster to submit the step to based on fewest number of steps in a pool of clusters
+
+    :param cluster_records a list of cluster records from DynamoDB
+    :returns the cluster_id as present in EMR
+    """
+    assert len(cluster_records) > 0
+    min_number_of_steps = sys.maxsize
+    cluster_id = ""
+    for cluster_record in cluster_records:
+        steps_on_cluster = cluster_record.get("number_of_steps", 0)
+        if steps_on_cluster < min_number_of_steps:
+            cluster_id = cluster_record["cluster_id"]
+            min_number_of_steps = steps_on_cluster
+    return cluster_id
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The Lambdas import their helpers relative to the sparkflowemr code directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sparkflowemr"))
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+import pytest
+
+from utils import date
+
+
+def test_from_string_minute_format():
+    assert date.from_string("2026-01-01T10:30") == datetime(2026, 1, 1, 10, 30)
+
+
+def test_from_string_iso():
+    assert date.from_string("2026-01-01T10:30:15") == datetime(2026, 1, 1, 10, 30, 15)
+
+
+def test_from_string_z_suffix():
+    assert date.from_string("2026-01-01T10:30:00Z") == datetime(2026, 1, 1, 10, 30)
+
+
+def test_from_string_offset_is_converted_to_utc():
+    assert date.from_string("2026-01-01T12:30:00+02:00") == datetime(2026, 1, 1, 10, 30)
+
+
+def test_from_string_empty():
+    assert date.from_string("") is None
+
+
+def test_from_string_invalid():
+    with pytest.raises(ValueError):
+        date.from_string("garbage")
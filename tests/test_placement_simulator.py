@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import placement_simulator
+from utils import placement
+
+
+def _cluster(cluster_id, creation="", end="", pool_id="pool-a"):
+    return {"cluster_id": cluster_id, "cluster_pool_id": pool_id, "creation_datetime": creation, "end_datetime": end}
+
+
+def _step(job_id, cluster_id, submitted, duration_minutes):
+    submitted_datetime = datetime.strptime("2026-01-01T" + submitted, "%Y-%m-%dT%H:%M")
+    return {
+        "job_id": job_id,
+        "cluster_id": cluster_id,
+        "submitted_datetime": submitted_datetime.strftime("%Y-%m-%dT%H:%M"),
+        "start_datetime": submitted_datetime.strftime("%Y-%m-%dT%H:%M"),
+        "end_datetime": (submitted_datetime + timedelta(minutes=duration_minutes)).strftime("%Y-%m-%dT%H:%M")
+    }
+
+
+def _simulate(steps, clusters, strategy="fewest_steps", step_concurrency=1):
+    return placement_simulator.simulate(
+        steps, clusters, placement_simulator.get_strategy(strategy), "pool-a", step_concurrency)
+
+
+def test_steps_queue_behind_each_other_on_a_single_slot():
+    steps = [_step("s1", "a", "00:00", 10), _step("s2", "a", "00:00", 10), _step("s3", "a", "00:05", 10)]
+    report = _simulate(steps, [_cluster("a")])
+    assert report["steps_replayed"] == 3
+    # s2 waits for s1 and s3 waits for s2, so the waits are 0, 10 and 15 minutes
+    assert report["queue_wait_seconds"]["max"] == 900.0
+    assert report["queue_wait_seconds"]["mean"] == pytest.approx((0 + 600 + 900) / 3)
+    assert report["makespan_seconds"] == 1800.0
+
+
+def test_step_concurrency_runs_steps_side_by_side():
+    steps = [_step("s1", "a", "00:00", 10), _step("s2", "a", "00:00", 10), _step("s3", "a", "00:00", 10)]
+    report = _simulate(steps, [_cluster("a")], step_concurrency=2)
+    assert report["queue_wait_seconds"]["max"] == 600.0
+    assert report["makespan_seconds"] == 1200.0
+
+
+def test_completion_frees_its_slot_before_a_submission_at_the_same_time():
+    steps = [_step("s1", "a", "00:00", 10), _step("s2", "a", "00:10", 10)]
+    report = _simulate(steps, [_cluster("a")])
+    assert report["queue_wait_seconds"]["max"] == 0.0
+    assert report["makespan_seconds"] == 1200.0
+
+
+def test_fewest_steps_strategy_matches_step_manager_logic():
+    records = [
+        {"cluster_id": "a", "state": "RUNNING", "number_of_steps": 3},
+        {"cluster_id": "b", "state": "RUNNING", "number_of_steps": 1},
+        {"cluster_id": "c", "state": "WAITING", "number_of_steps": 1}
+    ]
+    strategy = placement_simulator.get_strategy("fewest_steps")
+    assert strategy(records, {}) == placement.get_cluster_id_to_accept_step(records) == "b"
+
+
+def test_fewest_steps_spreads_steps_across_clusters():
+    steps = [_step("s1", "a", "00:00", 10), _step("s2", "a", "00:00", 10)]
+    report = _simulate(steps, [_cluster("a"), _cluster("b")])
+    assert report["queue_wait_seconds"]["max"] == 0.0
+    assert report["clusters"]["a"]["steps"] == 1
+    assert report["clusters"]["b"]["steps"] == 1
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        placement_simulator.get_strategy("fastest")
+
+
+def test_steps_are_only_placed_on_clusters_within_their_window():
+    clusters = [_cluster("a", end="2026-01-01T00:30"), _cluster("b", creation="2026-01-01T00:20")]
+    steps = [_step("s1", "a", "00:00", 5), _step("s2", "a", "00:10", 5), _step("s3", "a", "00:40", 5)]
+    report = _simulate(steps, clusters)
+    assert report["clusters"]["a"]["steps"] == 2
+    assert report["clusters"]["b"]["steps"] == 1
+
+
+def test_steps_without_live_clusters_are_unplaced():
+    clusters = [_cluster("a", creation="2026-01-01T00:30")]
+    report = _simulate([_step("s1", "a", "00:00", 5), _step("s2", "a", "00:40", 5)], clusters)
+    assert report["steps_unplaced"] == 1
+    assert report["steps_replayed"] == 1
+
+
+def test_termination_interrupts_running_steps_and_cancels_queued_ones():
+    clusters = [_cluster("a", creation="2026-01-01T00:00", end="2026-01-01T00:10")]
+    report = _simulate([_step("s1", "a", "00:00", 60), _step("s2", "a", "00:05", 5)], clusters)
+    assert report["steps_interrupted"] == 1
+    assert report["steps_cancelled"] == 1
+    assert report["steps_replayed"] == 1
+    assert report["clusters"]["a"]["busy_seconds"] == 600.0
+    assert report["clusters"]["a"]["utilization"] == 1.0
+    assert report["makespan_seconds"] == 600.0
+
+
+def test_skipped_and_unparseable_records_are_counted():
+    clusters = [_cluster("a"), _cluster("b", creation="garbage")]
+    incomplete = _step("s2", "a", "00:00", 5)
+    incomplete["end_datetime"] = ""
+    unparseable = _step("s3", "a", "00:00", 5)
+    unparseable["submitted_datetime"] = "garbage"
+    steps = [_step("s1", "a", "00:00", 5), incomplete, unparseable, _step("s4", "b", "00:00", 5)]
+    report = _simulate(steps, clusters)
+    assert report["steps_skipped"] == 2
+    assert report["clusters_skipped"] == 1
+    # Steps of a skipped cluster still belong to the pool and are replayed on the clusters left
+    assert report["steps_replayed"] == 2
+
+
+def test_steps_without_cluster_are_counted_once_across_pools():
+    clusters = [_cluster("a"), _cluster("z", pool_id="pool-b")]
+    steps = [_step("s1", "a", "00:00", 5), _step("s2", "deleted", "00:00", 5)]
+    assert placement_simulator.count_steps_without_cluster(steps, clusters) == 1
+    assert placement_simulator.get_pool_ids(clusters) == ["pool-a", "pool-b"]
+    assert _simulate(steps, clusters)["clusters"] == {"a": {"steps": 1, "busy_seconds": 300.0, "utilization": 1.0}}
+
+
+def test_duplicate_clusters_keep_the_most_complete_timeline():
+    clusters = [_cluster("a", creation="2026-01-01T00:00"), _cluster("a", "2026-01-01T00:00", "2026-01-01T00:30")]
+    report = _simulate([_step("s1", "a", "00:00", 5), _step("s2", "a", "00:40", 5)], clusters)
+    assert report["clusters_duplicated"] == 1
+    assert report["steps_unplaced"] == 1
+
+
+def test_utilization_and_load_skew():
+    steps = [_step("s1", "a", "00:00", 30), _step("s2", "a", "00:00", 10)]
+    report = _simulate(steps, [_cluster("a"), _cluster("b")])
+    assert report["clusters"]["a"]["utilization"] == 1.0
+    assert report["clusters"]["b"]["utilization"] == pytest.approx(1 / 3)
+    # Max over mean busy time of the two clusters alive over the whole replay
+    assert report["load_skew"] == pytest.approx(1800 / ((1800 + 600) / 2))
+
+
+def test_load_skew_only_compares_clusters_alive_at_the_same_time():
+    clusters = [
+        _cluster("a", "2026-01-01T00:00", "2026-01-01T00:10"),
+        _cluster("b", "2026-01-01T00:10", "2026-01-01T00:20"),
+        _cluster("c", "2026-01-01T00:10", "2026-01-01T00:20")
+    ]
+    steps = [_step("s1", "a", "00:00", 10), _step("s2", "a", "00:10", 10), _step("s3", "a", "00:10", 10)]
+    report = _simulate(steps, clusters)
+    # a is alone in the first slice and b and c are evenly loaded in the second
+    assert report["load_skew"] == 1.0
+
+
+def test_step_concurrency_must_be_positive():
+    with pytest.raises(ValueError):
+        _simulate([], [_cluster("a")], step_concurrency=0)